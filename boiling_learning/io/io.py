@@ -1,9 +1,11 @@
 import collections
 import io as _io
 import json
+import math
 import operator
 import os
 import pickle
+import re
 import string
 import warnings
 from contextlib import nullcontext
@@ -41,6 +43,12 @@ try:
 except ImportError:
     pass  # TODO: handle this case
 
+try:
+    # orjson is an optional dependency
+    import orjson
+except ImportError:
+    orjson = None
+
 import boiling_learning.utils as bl_utils
 from boiling_learning.utils import (
     PathLike,
@@ -212,6 +220,14 @@ def load_pkl(path: PathLike):
         return pickle.load(file)
 
 
+def _warn_if_not_json(path: Path) -> None:
+    if path.suffix != '.json':
+        warnings.warn(
+            f'A JSON file is expected, but *path* ends with "{path.suffix}"',
+            category=RuntimeWarning,
+        )
+
+
 def save_json(
     obj: _T,
     path: PathLike,
@@ -219,12 +235,7 @@ def save_json(
     cls: Optional[Type] = None,
 ) -> None:
     path = ensure_parent(path)
-
-    if path.suffix != '.json':
-        warnings.warn(
-            f'A JSON file is expected, but *path* ends with "{path.suffix}"',
-            category=RuntimeWarning,
-        )
+    _warn_if_not_json(path)
 
     dump = P(cls=cls).omit('cls', bl_utils.is_(None)).partial(dump)
     with path.open('w', encoding='utf-8') as file:
@@ -237,18 +248,132 @@ def load_json(
     cls: Optional[Type] = None,
 ) -> _T:
     path = ensure_resolved(path)
-
-    if path.suffix != '.json':
-        warnings.warn(
-            f'A JSON file is expected, but *path* ends with "{path.suffix}"',
-            category=RuntimeWarning,
-        )
+    _warn_if_not_json(path)
 
     load = P(cls=cls).omit('cls', bl_utils.is_(None)).partial(load)
     with path.open('r', encoding='utf-8') as file:
         return load(file)
 
 
+def _has_non_finite_floats(obj: Any) -> bool:
+    if isinstance(obj, float):
+        return not math.isfinite(obj)
+    if isinstance(obj, dict):
+        return any(map(_has_non_finite_floats, obj.values()))
+    if isinstance(obj, (list, tuple)):
+        return any(map(_has_non_finite_floats, obj))
+    if isinstance(obj, np.ndarray) and obj.dtype.kind in 'fc':
+        return not np.isfinite(obj).all()
+    return False
+
+
+def _orjson_dumps(
+    obj: Any, default: Optional[Callable[[Any], Any]], indent: bool
+) -> Optional[bytes]:
+    # returns None if orjson is not installed or if it would fail or write
+    # something different from the standard library
+    if orjson is None:
+        return None
+
+    default_results = []
+
+    def _orjson_default(value: Any) -> Any:
+        # orjson does not serialize tuple subclasses such as namedtuples,
+        # which the standard library writes as arrays
+        if isinstance(value, tuple):
+            return list(value)
+        if default is None:
+            raise TypeError(
+                f'Type is not JSON serializable: {type(value).__name__}'
+            )
+        result = default(value)
+        default_results.append(result)
+        return result
+
+    option = (
+        orjson.OPT_NON_STR_KEYS
+        | orjson.OPT_SERIALIZE_NUMPY
+        | orjson.OPT_PASSTHROUGH_DATACLASS
+        | orjson.OPT_PASSTHROUGH_DATETIME
+    )
+    if indent:
+        option |= orjson.OPT_INDENT_2
+
+    try:
+        content = orjson.dumps(obj, default=_orjson_default, option=option)
+    except TypeError:
+        # e.g. integers wider than 64 bits
+        return None
+
+    # orjson writes NaN and infinities as null. The (slower) check for them
+    # only runs when the output contains a null at all
+    if b'null' in content and _has_non_finite_floats([obj, default_results]):
+        return None
+
+    return content
+
+
+def dumps_json_fast(
+    obj: Any, default: Optional[Callable[[Any], Any]] = None
+) -> str:
+    '''Serialize *obj* to a JSON string using orjson if it is installed.
+
+    The standard library is used instead whenever orjson would fail or would
+    write something different from it.
+    '''
+    content = _orjson_dumps(obj, default, indent=False)
+    if content is None:
+        return json.dumps(obj, default=default)
+    return content.decode('utf-8')
+
+
+# any integer that may not fit in 64 bits
+_LONG_DIGITS_PATTERN = re.compile(r'\d{19}')
+
+
+def loads_json_fast(content: str) -> Any:
+    '''Deserialize a JSON string using orjson if it is installed.'''
+    if orjson is None or _LONG_DIGITS_PATTERN.search(content) is not None:
+        # orjson reads integers wider than 64 bits as floats
+        return json.loads(content)
+
+    try:
+        return orjson.loads(content)
+    except orjson.JSONDecodeError:
+        # orjson is stricter than the standard library, rejecting e.g. NaN
+        return json.loads(content)
+
+
+def save_json_fast(
+    obj: _T, path: PathLike, default: Optional[Callable[[Any], Any]] = None
+) -> None:
+    '''Save JSON using orjson if it is installed.
+
+    *default* is called on objects that cannot be serialized natively. The
+    standard library is used instead whenever orjson would fail or would
+    write something different from it.
+    '''
+    content = _orjson_dumps(obj, default, indent=True)
+    if content is None:
+        save_json(obj, path, dump=partial(json.dump, default=default))
+        return
+
+    path = ensure_parent(path)
+    _warn_if_not_json(path)
+    path.write_bytes(content)
+
+
+def load_json_fast(path: PathLike) -> Any:
+    '''Load JSON using orjson if it is installed.'''
+    if orjson is None:
+        return load_json(path)
+
+    path = ensure_resolved(path)
+    _warn_if_not_json(path)
+
+    return loads_json_fast(path.read_text(encoding='utf-8'))
+
+
 def saver_hdf5(key: str = '') -> SaverFunction[Any]:
     def save_hdf5(obj, path: PathLike) -> None:
         path = ensure_parent(path)
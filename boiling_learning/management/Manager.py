@@ -1,8 +1,16 @@
 import copy
 import enum
+import itertools
 import json
+import math
 import operator
+import os
 import pprint
+import re
+import stat
+import string
+import tempfile
+import weakref
 from functools import partial
 from pathlib import Path
 from typing import (
@@ -10,11 +18,13 @@ from typing import (
     Callable,
     Dict,
     Generic,
+    Hashable,
     Iterable,
     Iterator,
     List,
     Mapping,
     Optional,
+    Set,
     Tuple,
     TypeVar,
     Union,
@@ -49,10 +59,133 @@ from boiling_learning.utils.utils import (  # JSONDataType,; TODO: maybe using J
 # TODO: standardize "post_processor": sometimes *None* means *None*, other times it means "get the default one"
 
 _sentinel = _Sentinel.get_instance()
+# index key of the descriptions that could not be hashed
+_unhashable = object()
 _ElemType = TypeVar('_ElemType')
 _PostProcessedElemType = TypeVar('_PostProcessedElemType')
 
 
+def _make_index_parser(id_fmt: str, index_key: str) -> Callable[[str], int]:
+    fields = tuple(string.Formatter().parse(id_fmt))
+    replacement_fields = [
+        (field_name, format_spec, conversion)
+        for _, field_name, format_spec, conversion in fields
+        if field_name is not None
+    ]
+
+    if replacement_fields != [(index_key, '', None)]:
+        return funcy.rcompose(
+            parse.compile(id_fmt).parse, operator.itemgetter(index_key), int
+        )
+
+    # formats with only literal text around the index are matched with a
+    # compiled regular expression, which is much faster than *parse*
+    literals = [literal for literal, *_ in fields]
+    index_position = [field_name for _, field_name, *_ in fields].index(
+        index_key
+    )
+    prefix = ''.join(literals[: index_position + 1])
+    suffix = ''.join(literals[index_position + 1 :])
+    pattern = re.compile(
+        re.escape(prefix) + r'(\d+)' + re.escape(suffix) + r'\Z',
+        re.IGNORECASE,
+    )
+
+    def _parse_index(elem_id: str) -> int:
+        match = pattern.match(elem_id)
+        if match is None:
+            raise ValueError(f'"{elem_id}" does not match "{id_fmt}"')
+        return int(match.group(1))
+
+    return _parse_index
+
+
+def _freeze_description(obj: Any) -> Hashable:
+    if isinstance(obj, dict):
+        return frozenset(
+            (key, _freeze_description(value)) for key, value in obj.items()
+        )
+    if isinstance(obj, list):
+        return tuple(map(_freeze_description, obj))
+    if isinstance(obj, float) and math.isnan(obj):
+        # NaNs are never equal to each other, but equal descriptions encode
+        # them identically
+        return _sentinel
+    hash(obj)
+    return obj
+
+
+def _hash_description(description: Any) -> Hashable:
+    '''Hash a description consistently with *json_equivalent*.
+
+    Descriptions are compared by their decoded JSON, in which `1 == 1.0 ==
+    True`. Freezing the decoded object into frozensets and tuples keeps
+    exactly that equality, and Python hashes equal numbers equally.
+
+    Raises *TypeError* if the description cannot be indexed by its hash.
+    '''
+    decoded = json.loads(
+        json.dumps(description, cls=GenericJSONEncoder),
+        cls=GenericJSONDecoder,
+    )
+    if type(decoded) is not dict:
+        # custom objects define their own equality, which is not guaranteed
+        # to be consistent with any hash of their encoding
+        raise TypeError(
+            f'cannot hash description of type {type(decoded).__name__}'
+        )
+    return _freeze_description(decoded)
+
+
+class _TableFile:
+    '''A lookup table and its pending changes.
+
+    Kept apart from the *Manager* so that a finalizer can flush it without
+    keeping the *Manager* alive.
+    '''
+
+    def __init__(self, path: Path, saver: Callable[[dict, Path], Any]):
+        self.path: Path = path
+        self.saver: Callable[[dict, Path], Any] = saver
+        self.table: dict = {}
+        self.dirty: bool = False
+
+    def write(self) -> None:
+        # write to a temporary file first so that the table is never left
+        # half-written on disk. Its name is unique so that concurrent writers
+        # do not replace each other's temporary files
+        with tempfile.NamedTemporaryFile(
+            dir=self.path.parent,
+            prefix=f'{self.path.stem}.',
+            suffix=f'.tmp{self.path.suffix}',
+            delete=False,
+        ) as tmp_file:
+            tmp_path = Path(tmp_file.name)
+
+        try:
+            # temporary files are only readable by their owner, so give the
+            # table the permissions it would get if written in place
+            os.chmod(tmp_path, self._file_mode())
+            self.saver(self.table, tmp_path)
+            os.replace(tmp_path, self.path)
+        except BaseException:
+            tmp_path.unlink()
+            raise
+        self.dirty = False
+
+    def flush(self) -> None:
+        if self.dirty:
+            self.write()
+
+    def _file_mode(self) -> int:
+        try:
+            return stat.S_IMODE(self.path.stat().st_mode)
+        except FileNotFoundError:
+            umask = os.umask(0)
+            os.umask(umask)
+            return 0o666 & ~umask
+
+
 class Manager(
     bl.utils.SimpleRepr,
     Mapping[str, dict],
@@ -70,13 +203,18 @@ class Manager(
         workspace: str = 'workspace'
         path: str = 'path'
 
-    _default_table_saver = partial(bl.io.save_json, cls=GenericJSONEncoder)
-    _default_table_loader = partial(bl.io.load_json, cls=GenericJSONDecoder)
+    # *GenericJSONDecoder* only acts on the top-level object, which is always a
+    # plain dict for lookup tables, so decoding them needs no custom decoder
+    _default_table_saver = partial(
+        bl.io.save_json_fast, default=GenericJSONEncoder().default
+    )
+    _default_table_loader = bl.io.load_json_fast
     _default_description_comparer = partial(
         bl.utils.json_equivalent,
         encoder=GenericJSONEncoder,
         decoder=GenericJSONDecoder,
     )
+    _default_description_hasher = _hash_description
 
     class MultipleIdsHandler(enum.Enum):
         RAISE = enum.auto()
@@ -134,6 +272,10 @@ class Manager(
         description_comparer: Callable[
             [Mapping, Mapping], bool
         ] = _default_description_comparer,
+        description_hasher: Optional[
+            Callable[[Mapping], Hashable]
+        ] = _default_description_hasher,
+        autoflush: bool = True,
     ):
         '''
         The Manager's directory is structure like this:
@@ -165,25 +307,49 @@ class Manager(
             }
         }
         ```
+
+        If *description_hasher* is not *None*, descriptions considered
+        equivalent by *description_comparer* must have equal hashes. It is
+        used to index the entries by their contents, so that ids are looked
+        up without comparing against every entry. Descriptions for which it
+        raises *TypeError* or *ValueError* are always compared. It defaults
+        to *None* if a custom *description_comparer* is passed.
+
+        If *autoflush* is *True*, the lookup table is written to disk after
+        each modification, except inside a `with manager:` block, which
+        writes it only once on exit. Otherwise, it is written only by
+        `flush`, on exiting a `with` block or when the interpreter exits.
         '''
         self.key_names: self.Keys = key_names
         self._path: Path = bl.utils.ensure_dir(path)
         self._table_path: Path = self.path / 'lookup_table.json'
-        self._entries_dir_path: Path = bl.utils.ensure_dir(
-            self.path / self.key_names.entries
-        )
-        self._shared_dir_path: Path = bl.utils.ensure_dir(self.path / 'shared')
-        self._table_saver = table_saver
+        self._entries_dir_path: Path = self.path / self.key_names.entries
+        self._entries_dir_path.mkdir(exist_ok=True)
+        self._shared_dir_path: Path = self.path / 'shared'
+        self._shared_dir_path.mkdir(exist_ok=True)
+        self._table_file = _TableFile(self._table_path, table_saver)
         self._table_loader = table_loader
+        if (
+            description_comparer is not self._default_description_comparer
+            and description_hasher is _hash_description
+        ):
+            # the default hasher is only consistent with the default comparer
+            description_hasher = None
         self._description_comparer = description_comparer
+        self._description_hasher = description_hasher
+        self.autoflush: bool = autoflush
+        self._flush_deferrals: int = 0
+        self._used_indices_cache: Optional[Set[int]] = None
+        self._contents_cache: Optional[Dict[str, Mapping]] = None
+        self._contents_index_cache: Optional[Dict[Hashable, List[str]]] = None
 
         self.load_lookup_table()
 
         self.id_fmt: str = id_fmt
         self.index_key: str = index_key
 
-        self._parse_index: Callable[[str], int] = funcy.rcompose(
-            parse.compile(id_fmt).parse, operator.itemgetter(index_key), int
+        self._parse_index: Callable[[str], int] = _make_index_parser(
+            id_fmt, index_key
         )
 
         def _format_index(index: int) -> str:
@@ -201,6 +367,18 @@ class Manager(
         ] = post_processor
         self.verbose: VerboseType = verbose
 
+        if not autoflush:
+            weakref.finalize(self, self._table_file.flush)
+
+    def __enter__(self) -> 'Manager[_ElemType, _PostProcessedElemType]':
+        self._flush_deferrals += 1
+        return self
+
+    def __exit__(self, *args) -> None:
+        self._flush_deferrals -= 1
+        if not self._flush_deferrals:
+            self.flush()
+
     def __getitem__(self, elem_id: str):
         self.load_lookup_table()
         return self._lookup_table.setdefault(self.key_names.entries, {})[
@@ -208,13 +386,32 @@ class Manager(
         ]
 
     def __setitem__(self, elem_id: str, entry: Mapping[str, Any]) -> None:
-        self._lookup_table.setdefault(self.key_names.entries, {})[
-            elem_id
-        ] = entry
+        entries = self._lookup_table.setdefault(self.key_names.entries, {})
+        is_new = elem_id not in entries
+        entries[elem_id] = entry
+
+        if self._used_indices_cache is not None:
+            self._used_indices_cache.update(self._parse_indices((elem_id,)))
+        if self._contents_cache is not None:
+            self._contents_cache[elem_id] = self._entry_contents(entry)
+        if not is_new:
+            self._contents_index_cache = None
+        elif self._contents_index_cache is not None:
+            self._contents_index_cache.setdefault(
+                self._hash_contents(self._entry_contents(entry)), []
+            ).append(elem_id)
+
         self.save_lookup_table()
 
     def __delitem__(self, elem_id: str) -> None:
         del self._lookup_table.setdefault(self.key_names.entries, {})[elem_id]
+        if self._used_indices_cache is not None:
+            self._used_indices_cache.difference_update(
+                self._parse_indices((elem_id,))
+            )
+        if self._contents_cache is not None:
+            del self._contents_cache[elem_id]
+        self._contents_index_cache = None
         self.save_lookup_table()
 
     @property
@@ -243,37 +440,69 @@ class Manager(
     def shared_dir(self) -> Path:
         return self._shared_dir_path
 
+    # *entries_dir* is already resolved, so paths joined to it are created
+    # directly instead of being resolved again
     def entry_dir(self, elem_id: str) -> Path:
-        return bl.utils.ensure_dir(self.entries_dir / elem_id)
+        path = self.entries_dir / elem_id
+        path.mkdir(exist_ok=True, parents=True)
+        return path
 
     def elem_path(self, elem_id: str) -> Path:
-        return bl.utils.ensure_parent(
-            self.entry_dir(elem_id) / self.key_names.elements
-        )
+        return self.entry_dir(elem_id) / self.key_names.elements
 
     def elem_workspace(self, elem_id: str) -> Path:
-        return bl.utils.ensure_dir(
-            self.entry_dir(elem_id) / self.key_names.workspace
-        )
+        path = self.entry_dir(elem_id) / self.key_names.workspace
+        path.mkdir(exist_ok=True)
+        return path
+
+    @property
+    def _lookup_table(self) -> dict:
+        return self._table_file.table
+
+    @_lookup_table.setter
+    def _lookup_table(self, table: dict) -> None:
+        self._table_file.table = table
+
+    @property
+    def _dirty(self) -> bool:
+        return self._table_file.dirty
+
+    @_dirty.setter
+    def _dirty(self, dirty: bool) -> None:
+        self._table_file.dirty = dirty
 
     def _initialize_lookup_table(self) -> None:
         self._lookup_table = {self.key_names.entries: {}}
-        self.save_lookup_table()
+        self._write_lookup_table()
+
+    def _write_lookup_table(self) -> None:
+        self._table_file.write()
 
     def save_lookup_table(self) -> None:
-        self._table_saver(self._lookup_table, self._table_path)
+        self._dirty = True
+        if self.autoflush and not self._flush_deferrals:
+            self.flush()
+
+    def flush(self) -> None:
+        self._table_file.flush()
 
     def load_lookup_table(self, raise_if_fails: bool = False) -> None:
-        if not self._table_path.is_file():
-            self._initialize_lookup_table()
+        if self._dirty:
+            # the in-memory table holds changes not yet written to disk
+            return
+
+        self._used_indices_cache = None
+        self._contents_cache = None
+        self._contents_index_cache = None
         try:
             self._lookup_table = self._table_loader(self._table_path)
-        except (FileNotFoundError, json.JSONDecodeError, OSError):
+        except FileNotFoundError:
+            self._initialize_lookup_table()
+        except (json.JSONDecodeError, OSError):
             if raise_if_fails:
                 raise
 
             self._initialize_lookup_table()
-            self.load_lookup_table()
 
     def save_elem(self, elem: _ElemType, path: PathLike) -> None:
         if self.save_method is None:
@@ -297,31 +526,67 @@ class Manager(
         path = bl.utils.ensure_resolved(path)
         return self.load_method(path)
 
+    def _entry_contents(self, entry: Mapping) -> Mapping:
+        return entry.get(self.key_names.elements, {})
+
     def contents(self, elem_id: Optional[str] = None):
         if elem_id is None:
-            return {
-                elem_id: self.contents(elem_id) for elem_id in self.entries
-            }
+            # cached until the lookup table is modified or reloaded
+            if self._contents_cache is None:
+                self._contents_cache = {
+                    elem_id: self._entry_contents(entry)
+                    for elem_id, entry in self._lookup_table[
+                        self.key_names.entries
+                    ].items()
+                }
+            return dict(self._contents_cache)
         else:
-            return self.entries.get(elem_id, {}).get(
-                self.key_names.elements, {}
+            return self._entry_contents(
+                self._lookup_table[self.key_names.entries].get(elem_id, {})
             )
 
+    def _hash_contents(self, contents: Mapping) -> Hashable:
+        try:
+            return self._description_hasher(contents)
+        except (TypeError, ValueError):
+            return _unhashable
+
+    @property
+    def _contents_index(self) -> Dict[Hashable, List[str]]:
+        # maps the hash of each entry's contents to the ids sharing it
+        if self._contents_index_cache is None:
+            contents_index = {}
+            for elem_id, contents in self.contents().items():
+                contents_index.setdefault(
+                    self._hash_contents(contents), []
+                ).append(elem_id)
+            self._contents_index_cache = contents_index
+        return self._contents_index_cache
+
+    def _parse_indices(self, elem_ids: Iterable[str]) -> Iterator[int]:
+        return mit.map_except(
+            self._parse_index,
+            elem_ids,
+            ValueError,
+            TypeError,
+            KeyError,
+            AttributeError,
+        )
+
+    @property
+    def _used_indices(self) -> Set[int]:
+        # lazily built from the lookup table and updated incrementally on
+        # insertion/deletion, so that new ids are allocated without
+        # re-parsing every existing id
+        if self._used_indices_cache is None:
+            self._used_indices_cache = set(self._parse_indices(self.entries))
+        return self._used_indices_cache
+
     def new_elem_id(self) -> str:
         '''Return a elem id that does not exist yet'''
-        indices = sorted(
-            mit.map_except(
-                self._parse_index,
-                self.entries.keys(),
-                ValueError,
-                TypeError,
-                KeyError,
-                AttributeError,
-            )
-        )
+        indices = self._used_indices
         if indices:
-            missing_elems = bl.utils.missing_ints(indices)
-            index = mit.first(missing_elems, indices[-1] + 1)
+            index = bl.utils.first_missing_int(indices, start=min(indices))
         else:
             index = 0
 
@@ -343,14 +608,17 @@ class Manager(
     ) -> str:
         if contents is not None and key in contents:
             return contents[key]
-        elif hasattr(obj, 'name'):
-            return obj.name
-        elif hasattr(default_obj, 'name'):
-            return default_obj.name
-        else:
-            raise ValueError(
-                f'could not deduce name from ({key}, contents)=({obj},{contents})'
-            )
+
+        # a single *getattr* per object instead of *hasattr* followed by an
+        # attribute access
+        for candidate in (obj, default_obj):
+            name = getattr(candidate, 'name', _sentinel)
+            if name is not _sentinel:
+                return name
+
+        raise ValueError(
+            f'could not deduce name from ({key}, contents)=({obj},{contents})'
+        )
 
     def _resolve_contents(
         self,
@@ -463,9 +731,28 @@ class Manager(
             post_processor_description=post_processor_description,
         )
 
+        contents_hash = (
+            _unhashable
+            if self._description_hasher is None
+            else self._hash_contents(contents)
+        )
+        if contents_hash is _unhashable:
+            candidate_contents = self.contents()
+        else:
+            contents_index = self._contents_index
+            candidate_contents = {
+                elem_id: self.contents(elem_id)
+                for elem_id in itertools.chain(
+                    contents_index.get(contents_hash, ()),
+                    contents_index.get(_unhashable, ()),
+                )
+            }
+
         elem_id_candidates = tuple(
             bl.utils.extract_keys(
-                self.contents(), value=contents, cmp=self._description_comparer
+                candidate_contents,
+                value=contents,
+                cmp=self._description_comparer,
             )
         )
         n_candidates = len(elem_id_candidates)
@@ -23,7 +23,7 @@ def _reduce_average(
         weights * input_tensor, axis=axis, keepdims=keepdims
     )
     sum_of_weights = tf.reduce_sum(weights, axis=axis, keepdims=keepdims)
-    return weighted_sum / sum_of_weights
+    return tf.math.divide_no_nan(weighted_sum, sum_of_weights)
 
 
 class RSquare(Metric):
@@ -86,8 +86,20 @@ class RSquare(Metric):
         y_true = tf.cast(y_true, dtype=self._dtype)
         y_pred = tf.cast(y_pred, dtype=self._dtype)
         y_pred = tf.squeeze(y_pred)
+        squared_error = tf.square(y_true - y_pred)
+
         if sample_weight is None:
-            sample_weight = 1
+            # skip broadcasting and multiplying by an all-ones weight tensor
+            self.sum.assign_add(tf.reduce_sum(y_true, axis=0))
+            self.squared_sum.assign_add(
+                tf.reduce_sum(tf.square(y_true), axis=0)
+            )
+            self.res.assign_add(tf.reduce_sum(squared_error, axis=0))
+            self.count.assign_add(
+                tf.cast(tf.shape(y_true)[0], dtype=self._dtype)
+            )
+            return
+
         sample_weight = tf.cast(sample_weight, dtype=self._dtype)
         sample_weight = weights_broadcast_ops.broadcast_weights(
             weights=sample_weight, values=y_true
@@ -99,14 +111,20 @@ class RSquare(Metric):
             tf.reduce_sum(y_true * weighted_y_true, axis=0)
         )
         self.res.assign_add(
-            tf.reduce_sum(tf.square(y_true - y_pred) * sample_weight, axis=0)
+            tf.reduce_sum(squared_error * sample_weight, axis=0)
         )
         self.count.assign_add(tf.reduce_sum(sample_weight, axis=0))
 
     def result(self) -> tf.Tensor:
         mean = self.sum / self.count
         total = self.squared_sum - self.sum * mean
-        raw_scores = 1 - (self.res / total)
+        # as in scikit-learn, constant targets score 1 if they are predicted
+        # exactly and 0 otherwise
+        raw_scores = tf.where(
+            total == 0,
+            tf.where(self.res == 0, tf.ones_like(total), tf.zeros_like(total)),
+            1 - tf.math.divide_no_nan(self.res, total),
+        )
 
         if self.multioutput == 'raw_values':
             return raw_scores
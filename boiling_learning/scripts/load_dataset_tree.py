@@ -1,4 +1,6 @@
-from typing import List
+import os
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Iterator, List, Optional
 
 from dataclassy import dataclass
 
@@ -10,6 +12,8 @@ from boiling_learning.utils.utils import (
     print_verbose,
 )
 
+_VIDEO_SUFFIX = '.mp4'
+
 
 @dataclass(frozen=True)
 class Options:
@@ -19,57 +23,105 @@ class Options:
     extract_frames: bool = False
 
 
+def _subdirectories(path: PathLike) -> Iterator[os.DirEntry]:
+    # `os.scandir` gets the entry types while listing the directory, so that
+    # no extra `stat` call per entry is needed
+    with os.scandir(path) as entries:
+        for entry in entries:
+            if entry.is_dir():
+                yield entry
+
+
+def _videos(
+    path: PathLike, suffix: str = _VIDEO_SUFFIX
+) -> Iterator[os.DirEntry]:
+    try:
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.name.endswith(suffix) and entry.is_file():
+                    yield entry
+    except FileNotFoundError:
+        return
+
+
+def _load_dataset(
+    casedir: os.DirEntry, subcasedir: os.DirEntry
+) -> ImageDataset:
+    case = casedir.name
+    subcase = subcasedir.name
+
+    dataset: ImageDataset = ImageDataset(f'{case}:{subcase}')
+    for testdir in _subdirectories(subcasedir):
+        test_name = testdir.name
+
+        # plain strings avoid building intermediate `Path` objects per video
+        for video_entry in _videos(os.path.join(testdir.path, 'videos')):
+            video_name = video_entry.name[: -len(_VIDEO_SUFFIX)]
+            video_path = video_entry.path
+            df_path = video_path[: -len(_VIDEO_SUFFIX)] + '.csv'
+            ev = ExperimentVideo(
+                df_path=df_path,
+                video_path=video_path,
+                name=f'{case}:{subcase}:{test_name}:{video_name}',
+            )
+            dataset.add(ev)
+
+    return dataset
+
+
+def _extract_frames(dataset: ImageDataset) -> None:
+    dataset.extract_frames(
+        overwrite=False,
+        verbose=2,
+        chunk_sizes=(100, 100),
+        iterate=True,
+    )
+
+
 def main(
-    datapath: PathLike, options: Options, verbose: bool = True
+    datapath: PathLike,
+    options: Options,
+    verbose: bool = True,
+    max_processes: Optional[int] = None,
 ) -> List[ImageDataset]:
     datapath = ensure_resolved(datapath)
 
-    datasets: List[ImageDataset] = []
-    for casedir in datapath.iterdir():
-        if not casedir.is_dir():
-            continue
-
-        case = casedir.name
-        for subcasedir in casedir.iterdir():
-            if not subcasedir.is_dir():
-                continue
-
-            subcase = subcasedir.name
-
-            dataset: ImageDataset = ImageDataset(f'{case}:{subcase}')
-            for testdir in subcasedir.iterdir():
-                test_name = testdir.name
-
-                videopaths = (testdir / 'videos').glob('*.mp4')
-                for video_path in videopaths:
-                    video_name = video_path.stem
-                    ev_name = ':'.join((case, subcase, test_name, video_name))
-                    ev = ExperimentVideo(
-                        df_path=video_path.with_suffix('.csv'),
-                        video_path=video_path,
-                        name=ev_name,
-                    )
-                    dataset.add(ev)
-
-            if verbose:
-                print_header(dataset.name)
-
-            if options.extract_audios:
-                print_verbose(verbose, 'Extracting audios')
-                dataset.extract_audios(verbose=True)
-            if options.pre_load_videos:
-                print_verbose(verbose, 'Opening videos')
-                dataset.open_videos()
-            if options.extract_frames:
-                print_verbose(verbose, 'Extracting videos')
-                dataset.extract_frames(
-                    overwrite=False,
-                    verbose=2,
-                    chunk_sizes=(100, 100),
-                    iterate=True,
-                )
-
-            datasets.append(dataset)
+    casedirs, subcasedirs = [], []
+    for casedir in _subdirectories(datapath):
+        for subcasedir in _subdirectories(casedir):
+            casedirs.append(casedir)
+            subcasedirs.append(subcasedir)
+
+    # listing the tree is IO-bound: threads overlap the filesystem latencies
+    with ThreadPoolExecutor(
+        max_workers=min(32, 4 * (os.cpu_count() or 1))
+    ) as executor:
+        datasets: List[ImageDataset] = list(
+            executor.map(_load_dataset, casedirs, subcasedirs)
+        )
+
+    for dataset in datasets:
+        if verbose:
+            print_header(dataset.name)
+
+        if options.extract_audios:
+            print_verbose(verbose, 'Extracting audios')
+            dataset.extract_audios(verbose=True)
+
+    if options.extract_frames:
+        # frame extraction is CPU-bound, so it is spread over processes. This
+        # happens before opening the videos so that the datasets can be
+        # pickled
+        print_verbose(verbose, 'Extracting videos')
+        with ProcessPoolExecutor(max_workers=max_processes) as executor:
+            for _ in executor.map(_extract_frames, datasets):
+                pass
+
+    if options.pre_load_videos:
+        print_verbose(verbose, 'Opening videos')
+        for dataset in datasets:
+            dataset.open_videos()
+
     return datasets
 
 
@@ -30,8 +30,20 @@ class KeyedSet(MutableSet[_Value], Generic[_Key, _Value]):
     def __len__(self) -> int:
         return len(self.__data)
 
-    def __contains__(self, element: _Value) -> bool:
-        return element in self.values()
+    def __contains__(self, element: object) -> bool:
+        try:
+            key = self.__key(element)
+        except Exception:
+            # elements that cannot be keyed cannot be in the set
+            return False
+
+        try:
+            stored = self.__data[key]
+        except (KeyError, TypeError):
+            return False
+
+        # like `in`, check identity first so that e.g. NaN is found
+        return stored is element or bool(stored == element)
 
     def __iter__(self) -> Iterator[_Value]:
         return iter(self.values())
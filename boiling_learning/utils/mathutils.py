@@ -1,31 +1,47 @@
 import math
+import sys
 from fractions import Fraction
 from functools import reduce
 from typing import Any, Iterable, Tuple
 
 import funcy
+import numpy as np
 
 _sentinel = object()
+_MIN_VECTORIZED_LENGTH = 64
+
+
+if sys.version_info >= (3, 9):
+    # variadic C implementations
+    _gcd = math.gcd
+    _lcm = math.lcm
+else:
+
+    def _gcd(*args: int) -> int:
+        return reduce(math.gcd, args)
+
+    def _lcm(*args: int) -> int:
+        def _pairwise_lcm(x: int, y: int) -> int:
+            return abs(x * y) // math.gcd(x, y)
+
+        return reduce(_pairwise_lcm, args)
 
 
 def gcd(*args: int) -> int:
     if len(args) < 2:
         raise TypeError('*gcd* requires 2 or more arguments.')
 
-    return reduce(math.gcd, args)
+    return _gcd(*args)
 
 
 def lcm(*args: int) -> int:
     if len(args) < 2:
         raise TypeError('*lcm* requires 2 or more arguments.')
 
-    def _lcm(x, y):
-        return abs(x * y) // gcd(x, y)
-
-    return reduce(_lcm, args)
+    return _lcm(*args)
 
 
-def proportional_ints(*args: Fraction) -> Tuple[int, ...]:
+def _proportional_ints(args: Tuple[Fraction, ...]) -> Tuple[int, ...]:
     denominators = funcy.pluck_attr('denominator', args)
     denominators_lcm = lcm(*denominators)
 
@@ -36,7 +52,44 @@ def proportional_ints(*args: Fraction) -> Tuple[int, ...]:
     return tuple(ints)
 
 
+def proportional_ints(*args: Fraction) -> Tuple[int, ...]:
+    if len(args) < _MIN_VECTORIZED_LENGTH:
+        return _proportional_ints(args)
+
+    try:
+        numerators = np.fromiter(
+            funcy.pluck_attr('numerator', args),
+            dtype=np.int64,
+            count=len(args),
+        )
+        denominators = np.fromiter(
+            funcy.pluck_attr('denominator', args),
+            dtype=np.int64,
+            count=len(args),
+        )
+    except OverflowError:
+        return _proportional_ints(args)
+
+    denominators_lcm = _lcm(*np.unique(denominators).tolist())
+    max_numerator = max(-int(numerators.min()), int(numerators.max()))
+    if denominators_lcm * max_numerator > np.iinfo(np.int64).max:
+        # the results would overflow 64-bit integers
+        return _proportional_ints(args)
+
+    return tuple((denominators_lcm // denominators * numerators).tolist())
+
+
 def minmax(iterable: Iterable, default: Any = _sentinel) -> Tuple[Any, Any]:
+    # NaNs are skipped by the comparisons below (unless they come first), but
+    # propagate through `min` and `max`, so float arrays take the slow path
+    if (
+        isinstance(iterable, np.ndarray)
+        and iterable.ndim == 1
+        and iterable.size
+        and iterable.dtype.kind in 'biu'
+    ):
+        return iterable.min(), iterable.max()
+
     it = iter(iterable)
     try:
         first = next(it)
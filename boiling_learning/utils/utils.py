@@ -53,6 +53,13 @@ from typing_extensions import overload
 from boiling_learning.utils.functional import P
 from boiling_learning.utils.iterutils import flaglast
 
+try:
+    import fcntl
+except ImportError:
+    # Windows has no `fcntl`, but provides `msvcrt` instead
+    fcntl = None
+    import msvcrt
+
 # ---------------------------------- Typing ----------------------------------
 _EnumType = TypeVar('_EnumType', bound=enum.Enum)
 
@@ -215,6 +222,22 @@ def missing_ints(ints: Iterable[int]) -> Iterable[int]:
         return empty_gen()
 
 
+def first_missing_int(ints: Collection[int], start: int = 0) -> int:
+    '''Return the smallest integer from *start* onwards not in *ints*.'''
+    # *ints* can fill at most len(ints) of the first len(ints) + 1 candidates,
+    # so larger values never matter and the bitset size is bounded
+    size = len(ints) + 1
+    bitset = bytearray((size + 7) // 8)
+    for i in ints:
+        offset = i - start
+        if 0 <= offset < size:
+            bitset[offset >> 3] |= 1 << (offset & 7)
+
+    # the lowest clear bit of *bits* is the only bit set in ~bits & (bits + 1)
+    bits = int.from_bytes(bitset, 'little')
+    return start + (~bits & (bits + 1)).bit_length() - 1
+
+
 def is_consecutive(ints: Iterable[int], ignore_order: bool = False) -> bool:
     ints = tuple(ints)
     if not ints:
@@ -834,6 +857,48 @@ def JSONDict(
     )
 
 
+if fcntl is not None:
+
+    def _lock_file(file) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_EX)
+
+    def _unlock_file(file) -> None:
+        fcntl.flock(file.fileno(), fcntl.LOCK_UN)
+
+
+else:
+
+    def _lock_file(file) -> None:
+        file.seek(0)
+        while True:
+            try:
+                msvcrt.locking(file.fileno(), msvcrt.LK_LOCK, 1)
+                return
+            except OSError:
+                # `LK_LOCK` gives up after about 10 seconds
+                pass
+
+    def _unlock_file(file) -> None:
+        file.seek(0)
+        msvcrt.locking(file.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+@contextmanager
+def file_lock(path: PathLike) -> Iterator[None]:
+    '''Hold an exclusive inter-process lock on the file at *path*.
+
+    The file is created if needed. Note that it must not live inside a
+    directory backing a *JSONDict*, or it would be read as one of its keys.
+    '''
+    path = ensure_parent(path)
+    with path.open('a+b') as file:
+        _lock_file(file)
+        try:
+            yield
+        finally:
+            _unlock_file(file)
+
+
 def fix_path(
     path: PathLike, substitution_dict: Optional[Dict[str, str]] = None
 ) -> Path:
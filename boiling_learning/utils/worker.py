@@ -1,9 +1,12 @@
 from __future__ import annotations
 
-import datetime
-import shlex
+import bisect
+import heapq
+import itertools
 import subprocess
 import time
+import weakref
+from concurrent.futures import Future, ThreadPoolExecutor
 from contextlib import contextmanager
 from pathlib import Path
 from typing import (
@@ -23,11 +26,10 @@ from typing import (
     Union,
 )
 
-import json_tricks
-import more_itertools as mit
 import requests
 import zict
 from pkg_resources import resource_filename
+from requests.adapters import HTTPAdapter
 
 import boiling_learning as bl
 from boiling_learning.utils.utils import (
@@ -36,6 +38,7 @@ from boiling_learning.utils.utils import (
     empty_gen,
     ensure_dir,
     ensure_resolved,
+    file_lock,
     fix_path,
     indexify,
     print_verbose,
@@ -45,21 +48,47 @@ from boiling_learning.utils.utils import (
 _T = TypeVar('_T')
 
 
+def _json_dict(path: PathLike) -> zict.Func:
+    return JSONDict(
+        path, dumps=bl.io.dumps_json_fast, loads=bl.io.loads_json_fast
+    )
+
+
+def _load_tickets(
+    tickets: Union[List[int], Dict[str, List[int]]]
+) -> List[int]:
+    # stores written through json_tricks encode the used tickets as
+    # {'__set__': [...]} instead of a sorted list
+    if isinstance(tickets, dict):
+        try:
+            return sorted(tickets['__set__'])
+        except KeyError:
+            raise ValueError(
+                f'invalid tickets {tickets!r}. Pass *reset=True* to start'
+                ' a new pool.'
+            ) from None
+    return tickets
+
+
 def apply_to_obj(tpl: Tuple[Any, str, Iterable, Mapping[str, Any]]):
-    if len(tpl) != 4:
+    try:
+        obj, fname, args, kwargs = tpl
+    except ValueError:
         raise ValueError(
             'expected a tuple in the format (obj, fname, args, kwargs)'
-        )
+        ) from None
 
-    obj, fname, args, kwargs = tpl
     return getattr(obj, fname)(*args, **kwargs)
 
 
 def apply_to_f(tpl: Tuple[Callable, Iterable, Mapping[str, Any]]):
-    if len(tpl) != 3:
-        raise ValueError('expected a tuple in the format (f, args, kwargs)')
+    try:
+        f, args, kwargs = tpl
+    except ValueError:
+        raise ValueError(
+            'expected a tuple in the format (f, args, kwargs)'
+        ) from None
 
-    f, args, kwargs = tpl
     return f(*args, **kwargs)
 
 
@@ -69,7 +98,14 @@ def distribute_iterable(
     assignments: Optional[Mapping[Hashable, Iterable]] = None,
     assign_pred: Optional[Callable[[Hashable], bool]] = None,
     assign_iterable: Optional[Iterable] = None,
+    weights: Optional[Mapping[Hashable, float]] = None,
 ) -> Dict[Hashable, List]:
+    '''Distribute the items in *iterable* among *keys*.
+
+    Each item goes to the key with the lowest load, which is its number of
+    items (including any *assignments*) divided by its weight in *weights*.
+    Missing weights default to 1, and keys weighing 0 get no new items.
+    '''
     if (assign_pred, assign_iterable).count(None) == 1:
         raise ValueError(
             'either both or none of assign_pred and assign_iterable must be passed as arguments.'
@@ -82,28 +118,88 @@ def distribute_iterable(
             assignments,
         )
 
-    if assignments is None:
+    if assignments is None and weights is None:
         n_keys = len(keys)
-
-        return dict(zip(keys, map(list, mit.distribute(n_keys, iterable))))
-    else:
-        distributed = bl.utils.merge_dicts(
-            {k: [] for k in keys}, {k: list(v) for k, v in assignments.items()}
-        )
-        distributed_items = sorted(
-            distributed.items(), key=(lambda pair: len(pair[1]))
-        )
-
-        n_keys = len(distributed_items)
-        level, pos = 0, 0
+        if n_keys < 1:
+            raise ValueError('at least one key is required.')
+
+        # round-robin in a single pass, without the buffering of
+        # `mit.distribute`
+        buckets = [[] for _ in range(n_keys)]
+        for idx, item in enumerate(iterable):
+            buckets[idx % n_keys].append(item)
+
+        return dict(zip(keys, buckets))
+
+    distributed = bl.utils.merge_dicts(
+        {k: [] for k in keys},
+        {k: list(v) for k, v in (assignments or {}).items()},
+    )
+
+    if weights is None:
+        # fill the keys level by level, least loaded first: the first
+        # *n_filling* buckets hold *level* items, and the others at least as
+        # many. Each item costs O(1), and each key joins the filling round
+        # once
+        buckets = sorted(distributed.values(), key=len)
+        n_keys = len(buckets)
+        if not n_keys:
+            for _ in iterable:
+                raise ValueError('at least one key is required.')
+            return distributed
+
+        level = len(buckets[0])
+        n_filling = 1
+        while n_filling < n_keys and len(buckets[n_filling]) == level:
+            n_filling += 1
+
+        pos = 0
         for item in iterable:
-            distributed_items[pos][1].append(item)
+            buckets[pos].append(item)
             pos += 1
-            if pos == n_keys or len(distributed_items[pos][1]) > level:
-                level += 1
+            if pos == n_filling:
                 pos = 0
+                level += 1
+                while n_filling < n_keys and len(buckets[n_filling]) == level:
+                    n_filling += 1
+
+        return distributed
+
+    if any(weight < 0 for weight in weights.values()):
+        raise ValueError(f'weights must be non-negative, got {weights}.')
+
+    # weighted loads do not grow in lockstep, so they cannot be filled level
+    # by level. Instead, a min-heap of (load after one more item, insertion
+    # order, item count, bound `append`, weight) finds the least loaded key
+    # in O(log(n_keys)) per item. The insertion order breaks ties so that the
+    # other fields are never compared, and carrying the count and `append`
+    # spares the loop any dict lookups or `len` calls
+    heap = []
+    for idx, (key, items) in enumerate(distributed.items()):
+        weight = weights.get(key, 1)
+        if weight:
+            count = len(items)
+            heap.append(
+                ((count + 1) / weight, idx, count, items.append, weight)
+            )
+    heapq.heapify(heap)
 
-        return dict(distributed_items)
+    if not heap:
+        for _ in iterable:
+            raise ValueError(
+                'there are no keys with positive weights to distribute'
+                ' items among.'
+            )
+        return distributed
+
+    heapreplace = heapq.heapreplace
+    for item in iterable:
+        _, idx, count, append, weight = heap[0]
+        append(item)
+        count += 1
+        heapreplace(heap, ((count + 1) / weight, idx, count, append, weight))
+
+    return distributed
 
 
 class BaseUserPool:
@@ -148,12 +244,24 @@ class UserPool(BaseUserPool):
         super().__init__(enabled)
 
         if manager is None:
-            workers = mit.peekable(workers)
-            manager = workers[0]
+            if isinstance(workers, Sequence):
+                manager = workers[0]
+            else:
+                workers_iter = iter(workers)
+                manager = next(workers_iter)
+                workers = itertools.chain((manager,), workers_iter)
         self.manager = manager
 
         self.workers = sorted(workers)
 
+        # the pool's users are fixed, so membership checks use precomputed
+        # sets instead of scanning the workers list
+        self._workers_set = frozenset(self.workers)
+        self._clients = [
+            worker for worker in self.workers if worker != self.manager
+        ]
+        self._clients_set = frozenset(self._clients)
+
         if current is not None:
             self.current = current
         self.server = server
@@ -169,6 +277,9 @@ class UserPool(BaseUserPool):
     def __len__(self) -> int:
         return len(self.workers)
 
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._workers_set
+
     @property
     def current(self):
         return self._current
@@ -180,10 +291,11 @@ class UserPool(BaseUserPool):
                 f'notebook user {current} is not expected. Allowed users are {self.workers}.'
             )
         self._current = current
+        self._current_index = self.workers.index(current)
 
     @property
     def clients(self) -> List[Hashable]:
-        return [worker for worker in self if worker != self.manager]
+        return list(self._clients)
 
     @classmethod
     def from_json(
@@ -218,7 +330,9 @@ class UserPool(BaseUserPool):
         assign_iterable: Optional[Iterable] = None,
     ) -> Mapping[Hashable, Iterable]:
         if assignments is not None:
-            user_diff = set(assignments.keys()) - set(self)
+            user_diff = [
+                user for user in assignments if user not in self._workers_set
+            ]
             if user_diff:
                 raise ValueError(f'some users were not expected: {user_diff}')
 
@@ -232,7 +346,13 @@ class UserPool(BaseUserPool):
 
     def get_iterable(self, iterable: Iterable) -> Iterable:
         if self.is_enabled:
-            return self.distribute_iterable(iterable)[self.current]
+            # equivalent to `self.distribute_iterable(iterable)[self.current]`,
+            # but without building the other workers' lists
+            return list(
+                itertools.islice(
+                    iterable, self._current_index, None, len(self.workers)
+                )
+            )
         else:
             return iterable
 
@@ -240,7 +360,7 @@ class UserPool(BaseUserPool):
         return self.current == self.manager
 
     def is_client(self) -> bool:
-        return self.current in self.clients
+        return self.current in self._clients_set
 
     def is_server(self) -> bool:
         return self.current == self.server
@@ -263,20 +383,22 @@ class DynamicUserPool(BaseUserPool):
         self.path = ensure_dir(path)
         self._cases_path = self.path / 'cases'
         self._users_path = self.path / 'users'
+        # serializes the read-modify-write sections of concurrent workers
+        self._lock_path = self.path / 'lock'
 
-        self._data = JSONDict(
-            self._users_path, dumps=json_tricks.dumps, loads=json_tricks.loads
-        )
-        self._cases = JSONDict(
-            self._cases_path, dumps=json_tricks.dumps, loads=json_tricks.loads
-        )
+        self._data = _json_dict(self._users_path)
+        self._cases = _json_dict(self._cases_path)
         self._current_ticket: Optional[int] = None
+        # a case's tickets are fixed when it is opened, so they are read from
+        # the store at most once per case
+        self._cases_used_tickets: Dict[str, List[int]] = {}
 
         if workers is not None:
             if overwrite or 'available_tickets' not in self._data:
                 self._data['available_tickets'] = list(indexify(workers))
             if overwrite or 'used_tickets' not in self._data:
-                self._data['used_tickets'] = set()
+                # sets are not JSON-serializable: store a sorted list instead
+                self._data['used_tickets'] = []
 
     def __str__(self) -> str:
         return ''.join(
@@ -300,6 +422,14 @@ class DynamicUserPool(BaseUserPool):
     def __len__(self) -> int:
         return len(self.available_tickets())
 
+    # without these, iteration and membership tests fall back to
+    # `__getitem__` and read the store once per ticket
+    def __iter__(self) -> Iterator[int]:
+        return iter(self.available_tickets())
+
+    def __contains__(self, ticket: Hashable) -> bool:
+        return ticket in self.available_tickets()
+
     def current_ticket(self) -> Optional[int]:
         return self._current_ticket
 
@@ -307,29 +437,55 @@ class DynamicUserPool(BaseUserPool):
         return self._data['available_tickets']
 
     def used_tickets(self) -> Set[int]:
-        return self._data['used_tickets']
+        return set(_load_tickets(self._data['used_tickets']))
 
     def is_stamped(self) -> bool:
         return self.current_ticket is not None
 
     def stamp_ticket(self) -> int:
-        available_tickets = self._data['available_tickets']
-        used_tickets = self._data['used_tickets']
+        with file_lock(self._lock_path):
+            available_tickets = self.available_tickets()
+            used_tickets = _load_tickets(self._data['used_tickets'])
+
+            ticket = available_tickets.pop(0)
+            # the stored list is already sorted, so the ticket is inserted in
+            # place instead of going through a set and re-sorting
+            pos = bisect.bisect_left(used_tickets, ticket)
+            if pos == len(used_tickets) or used_tickets[pos] != ticket:
+                used_tickets.insert(pos, ticket)
+
+            self._data.update(
+                {
+                    'available_tickets': available_tickets,
+                    'used_tickets': used_tickets,
+                }
+            )
 
-        ticket = available_tickets.pop(0)
         self._current_ticket = ticket
-        used_tickets.add(ticket)
-
-        self._data['available_tickets'] = available_tickets
-        self._data['used_tickets'] = used_tickets
         return ticket
 
-    def _open_case(self, case_name: str) -> zict.Func:
-        if case_name not in self._cases:
-            self._cases[case_name] = {
-                'available_tickets': self._data['available_tickets'],
-                'used_tickets': self._data['used_tickets'],
-            }
+    def _open_case(self, case_name: str) -> List[int]:
+        try:
+            return self._cases_used_tickets[case_name]
+        except KeyError:
+            pass
+
+        with file_lock(self._lock_path):
+            if case_name not in self._cases:
+                # the store caches its keys: reopen it to see the cases
+                # opened by other workers
+                self._cases = _json_dict(self._cases_path)
+            if case_name not in self._cases:
+                self._cases[case_name] = {
+                    'available_tickets': self._data['available_tickets'],
+                    'used_tickets': _load_tickets(self._data['used_tickets']),
+                }
+
+            used_tickets = _load_tickets(
+                self._cases[case_name]['used_tickets']
+            )
+        self._cases_used_tickets[case_name] = used_tickets
+        return used_tickets
 
     def distribute_iterable(
         self,
@@ -339,15 +495,19 @@ class DynamicUserPool(BaseUserPool):
         assign_pred: Optional[Callable[[Hashable], bool]] = None,
         assign_iterable: Optional[Iterable] = None,
     ) -> Mapping[Hashable, Iterable]:
-        self._open_case(case_name)
+        used_tickets = self._open_case(case_name)
 
         if assignments is not None:
-            user_diff = set(assignments.keys()) - set(self)
+            # iterating over `self` would read the store once per ticket
+            available_tickets = frozenset(self.available_tickets())
+            user_diff = [
+                user for user in assignments if user not in available_tickets
+            ]
             if user_diff:
                 raise ValueError(f'some users were not expected: {user_diff}')
 
         return distribute_iterable(
-            self._cases[case_name]['used_tickets'],
+            used_tickets,
             iterable,
             assignments=assignments,
             assign_pred=assign_pred,
@@ -355,11 +515,7 @@ class DynamicUserPool(BaseUserPool):
         )
 
     def get_iterable(self, case_name: str, iterable: Iterable) -> Iterable:
-        case_dict = JSONDict(
-            self._cases_path, dumps=json_tricks.dumps, loads=json_tricks.loads
-        )
-        if case_name not in case_dict:
-            case_dict[case_name] = self._data
+        used_tickets = self._open_case(case_name)
 
         if not self.is_enabled:
             return iterable
@@ -368,7 +524,7 @@ class DynamicUserPool(BaseUserPool):
 
         return (
             self.distribute_iterable(case_name, iterable)[current_ticket]
-            if current_ticket in self._cases[case_name]['used_tickets']
+            if current_ticket in used_tickets
             else empty_gen()
         )
 
@@ -379,9 +535,10 @@ class LFSSequenceDistributor:
         if reset:
             rmdir(path, recursive=True, missing_ok=True, keep=True)
         self.path = path
-        self._cases = JSONDict(
-            self.path, dumps=json_tricks.dumps, loads=json_tricks.loads
-        )
+        self._cases = _json_dict(self.path)
+        # the lock lives next to the store, since every file inside it is
+        # read as a case
+        self._lock_path = path.with_name(f'{path.name}.lock')
 
     def current(self, case_name: str) -> int:
         return self._cases[case_name]['current']
@@ -395,19 +552,31 @@ class LFSSequenceDistributor:
             'current': current,
         }
 
-    def get(self, case_name: str, seq: Sequence[_T]) -> Iterator[_T]:
-        total_length = len(seq)
+    def _advance(self, case_name: str, total_length: int) -> Optional[int]:
+        # the state is read once per item. It is not cached between items
+        # because other workers advance it concurrently
+        with file_lock(self._lock_path):
+            if case_name not in self._cases:
+                # the store caches its keys: reopen it to see the cases
+                # created by other workers
+                self._cases = _json_dict(self.path)
+            if case_name not in self._cases:
+                self._set_case(case_name, total_length, 0)
 
-        if case_name not in self._cases:
-            self._set_case(case_name, total_length, 0)
-
-        while (
-            self.current(case_name) is None
-            or self.current(case_name) < total_length
-        ):
             current = self.current(case_name)
+            if current is not None and current >= total_length:
+                return None
+
             self._set_case(case_name, total_length, current + 1)
+            return current
+
+    def get(self, case_name: str, seq: Sequence[_T]) -> Iterator[_T]:
+        total_length = len(seq)
+
+        current = self._advance(case_name, total_length)
+        while current is not None:
             yield seq[current]
+            current = self._advance(case_name, total_length)
 
 
 class SequenceDistributorServer:
@@ -423,6 +592,12 @@ class SequenceDistributorServer:
         self._venv_name = venv_name
 
         self._logs_filepath = self.data_dir / 'logs.txt'
+        # the log is kept open (line-buffered) rather than reopened for every
+        # message
+        self._log_file = self._logs_filepath.open('a', buffering=1)
+        self._log_file_finalizer = weakref.finalize(self, self._log_file.close)
+        self._last_log_sec: int = -1
+        self._last_log_timestamp: str = ''
         self._public_url_filepath = self.data_dir / 'url.txt'
         if self._public_url_filepath.is_file():
             self._public_url_filepath.unlink()
@@ -447,9 +622,18 @@ class SequenceDistributorServer:
                 print(''.join(logs))
 
     def _log(self, text: str, end: str = '\n') -> None:
-        now = datetime.datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-        with self._logs_filepath.open('a') as log:
-            log.write(f'[{now}] {text}{end}')
+        # timestamps have a resolution of one second, so they are formatted
+        # at most once per second
+        sec = int(time.time())
+        if sec != self._last_log_sec:
+            self._last_log_sec = sec
+            self._last_log_timestamp = time.strftime(
+                '%Y-%m-%d %H:%M:%S', time.localtime(sec)
+            )
+        self._log_file.write(f'[{self._last_log_timestamp}] {text}{end}')
+
+    def close(self) -> None:
+        self._log_file_finalizer()
 
     def run(self) -> None:
         if self._venv_name is None:
@@ -473,9 +657,17 @@ class SequenceDistributorServer:
             f'python {self._main_filepath} {self._port} "{self._public_url_filepath}"',
         )
 
-        for command in run_python_commands:
-            self._log(f'Running: {command}')
-            subprocess.run(shlex.split(command))
+        # a single shell keeps the environment of `source` for the following
+        # commands, which separate processes would each lose
+        command = ' && '.join(run_python_commands)
+        self._log(f'Running: {command}')
+        self._log_file.flush()
+        subprocess.run(
+            ['bash', '-c', command],
+            stdout=self._log_file,
+            stderr=subprocess.STDOUT,
+            check=True,
+        )
 
         # self.tunnel = ngrok.connect(str(self._port))
         self._log('Connected.')
@@ -485,27 +677,53 @@ class SequenceDistributorServer:
 class SequenceDistributorClient:
     def __init__(self, url: str):
         self.url: str = url
+        self._root_url: str = url + '/'
+        self._assign_url: str = url + '/assign'
+        self._complete_url: str = url + '/complete'
+
+        # a persistent session keeps the connection to the server alive
+        # between requests instead of reconnecting for every item
+        self._session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=4)
+        self._session.mount('http://', adapter)
+        self._session.mount('https://', adapter)
+
+    def __enter__(self) -> SequenceDistributorClient:
+        return self
+
+    def __exit__(self, *args) -> None:
+        self.close()
+
+    def close(self) -> None:
+        self._session.close()
 
     @classmethod
     def from_file(
-        path: PathLike, sleep_time: int = 0, verbose: bool = False
+        cls, path: PathLike, sleep_time: float = 0, verbose: bool = False
     ) -> SequenceDistributorClient:
+        '''Create a client for the URL written in the file at *path*.
+
+        If *sleep_time* is positive, wait for the file to appear. Polls
+        start 10ms apart and back off exponentially up to *sleep_time*
+        seconds apart.
+        '''
         url_path = ensure_resolved(path)
 
         if sleep_time > 0:
+            delay = min(0.01, sleep_time)
             while not url_path.is_file():
                 print_verbose(verbose, 'File not found:', url_path)
-                print_verbose(verbose, f'Sleeping for {sleep_time}s')
-                time.sleep(sleep_time)
+                print_verbose(verbose, f'Sleeping for {delay}s')
+                time.sleep(delay)
+                delay = min(2 * delay, sleep_time)
 
         url = url_path.read_text()
 
-        return SequenceDistributorClient(url)
+        return cls(url)
 
     def connect(self) -> bool:
-        url = self.url + '/'
         try:
-            r = requests.get(url)
+            r = self._session.get(self._root_url)
             r.raise_for_status()
             return True
         except requests.HTTPError:
@@ -517,21 +735,45 @@ class SequenceDistributorClient:
         if not isinstance(seq, int):
             seq = len(seq)
 
-        url = self.url + '/assign'
-        r = requests.get(url, params={'case_name': case_name, 'seq': seq})
+        r = self._session.get(
+            self._assign_url, params={'case_name': case_name, 'seq': seq}
+        )
         r.raise_for_status()
         try:
             return r.json()
         except KeyError:
             raise RuntimeError('response does not contain a *index* field')
 
+    def _complete(
+        self, session: requests.Session, case_name: str, index: int
+    ) -> None:
+        session.put(
+            self._complete_url, data={'case_name': case_name, 'index': index}
+        )
+
     def complete(self, case_name: str, index: int) -> None:
-        url = self.url + '/complete'
-        requests.put(url, data={'case_name': case_name, 'index': index})
+        self._complete(self._session, case_name, index)
 
     def consume(self, case_name: str, seq: Sequence[_T]) -> Iterator[_T]:
-        index = self.assign(case_name, seq)
-        while index is not None:
-            yield seq[index]
-            self.complete(case_name, index)
-            index = self.assign(case_name, seq)
+        # completions are sent in the background so that the next assignment
+        # does not wait for the previous round-trip. The background thread
+        # gets its own session, since sessions are not documented as
+        # thread-safe
+        with requests.Session() as completion_session, ThreadPoolExecutor(
+            max_workers=1
+        ) as executor:
+            completion: Optional[Future] = None
+            try:
+                index = self.assign(case_name, seq)
+                while index is not None:
+                    yield seq[index]
+                    if completion is not None:
+                        # surface errors from the previous completion
+                        completion.result()
+                    completion = executor.submit(
+                        self._complete, completion_session, case_name, index
+                    )
+                    index = self.assign(case_name, seq)
+            finally:
+                if completion is not None:
+                    completion.result()
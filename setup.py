@@ -20,7 +20,7 @@ REQUIRES = read_lines(project_path / 'requirements.txt')
 
 EXTRAS_REQUIRE = {
     extra: read_lines(project_path / f'requirements-{extra}.txt')
-    for extra in ('dev', 'scripts')
+    for extra in ('dev', 'fast', 'scripts')
 }
 EXTRAS_REQUIRE['all'] = [
     extra_req
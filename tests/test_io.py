@@ -1,12 +1,21 @@
 import json
+import math
+from collections import namedtuple
 from unittest import TestCase
 
+from boiling_learning.io.io import (
+    dumps_json_fast,
+    load_json_fast,
+    loads_json_fast,
+    save_json_fast,
+)
 from boiling_learning.io.storage import (
     json_decode,
     json_deserialize,
     json_encode,
     json_serialize,
 )
+from boiling_learning.utils.utils import tempfilepath
 
 
 class storage_Test(TestCase):
@@ -41,3 +50,52 @@ class storage_Test(TestCase):
         decoded = json_deserialize(json.loads(encoded))
 
         self.assertTupleEqual(decoded, test_tuple)
+
+
+class json_fast_Test(TestCase):
+    def _round_trip(self, obj, **kwargs):
+        with tempfilepath(suffix='.json') as path:
+            save_json_fast(obj, path, **kwargs)
+            return load_json_fast(path)
+
+    def test_round_trip(self):
+        obj = {
+            'int': 314159,
+            'float': 2.5,
+            'str': 'apple pie tastes good',
+            'list': [1, None, True],
+            1: 'non-string key',
+        }
+        self.assertDictEqual(
+            self._round_trip(obj), json.loads(json.dumps(obj))
+        )
+
+    def test_non_finite_floats(self):
+        decoded = self._round_trip(
+            {'inf': float('inf'), 'nan': float('nan'), 'none': None}
+        )
+
+        self.assertEqual(decoded['inf'], float('inf'))
+        self.assertTrue(math.isnan(decoded['nan']))
+        self.assertIsNone(decoded['none'])
+
+    def test_wide_ints(self):
+        obj = {'wide': 2 ** 70, 'negative': -(2 ** 70)}
+        self.assertDictEqual(self._round_trip(obj), obj)
+
+    def test_namedtuples(self):
+        Point = namedtuple('Point', 'x y')
+
+        self.assertDictEqual(
+            self._round_trip({'point': Point(1, 2)}), {'point': [1, 2]}
+        )
+        self.assertDictEqual(
+            self._round_trip({'point': Point(1, 2)}, default=str),
+            {'point': [1, 2]},
+        )
+
+    def test_dumps_loads(self):
+        obj = {'wide': 2 ** 70, 'inf': float('inf'), 1: [None, True]}
+        self.assertDictEqual(
+            loads_json_fast(dumps_json_fast(obj)), json.loads(json.dumps(obj))
+        )
@@ -1,5 +1,7 @@
+import os
+import stat
 from pathlib import Path
-from unittest.case import TestCase
+from unittest.case import TestCase, skipIf
 
 from tinydb import TinyDB
 
@@ -72,6 +74,85 @@ class ManagerTest(TestCase):
                 dict(manager.retrieve_elems()), {elem_id: res}
             )
 
+    def test_new_elem_id(self):
+        with tempdir() as path:
+            manager = Manager(path)
+
+            self.assertEqual(manager.new_elem_id(), '0.data')
+
+            for elem_id in ('0.data', '1.data', '3.data'):
+                manager[elem_id] = {}
+            self.assertEqual(manager.new_elem_id(), '2.data')
+
+            manager['2.data'] = {}
+            self.assertEqual(manager.new_elem_id(), '4.data')
+
+            del manager['1.data']
+            self.assertEqual(manager.new_elem_id(), '1.data')
+
+    def test_deferred_flush(self):
+        with tempdir() as path:
+            manager = Manager(path)
+
+            with manager:
+                manager['0.data'] = {}
+                manager['1.data'] = {}
+                self.assertDictEqual(
+                    load_json(manager.table_path), {'entries': {}}
+                )
+                self.assertEqual(len(manager), 2)
+
+            self.assertDictEqual(
+                load_json(manager.table_path),
+                {'entries': {'0.data': {}, '1.data': {}}},
+            )
+
+    @skipIf(os.name == 'nt', 'POSIX file modes are required')
+    def test_table_file_mode(self):
+        umask = os.umask(0o022)
+        try:
+            with tempdir() as path:
+                manager = Manager(path)
+                manager['0.data'] = {}
+                self.assertEqual(
+                    stat.S_IMODE(manager.table_path.stat().st_mode), 0o644
+                )
+
+                manager.table_path.chmod(0o640)
+                manager['1.data'] = {}
+                self.assertEqual(
+                    stat.S_IMODE(manager.table_path.stat().st_mode), 0o640
+                )
+        finally:
+            os.umask(umask)
+
+    def test_elem_id_equivalent_contents(self):
+        with tempdir() as path:
+            manager = Manager(path)
+
+            elem_id = manager.provide_entry(
+                contents={'x': 1}, include=True, missing_ok=True
+            )
+            self.assertEqual(manager.elem_id(contents={'x': 1.0}), elem_id)
+            self.assertEqual(manager.elem_id(contents={'x': True}), elem_id)
+            self.assertNotEqual(manager.elem_id(contents={'x': 2}), elem_id)
+
+            mixed_keys = {1: 'a', 'b': 2}
+            mixed_id = manager.provide_entry(
+                contents=mixed_keys, include=True, missing_ok=True
+            )
+            self.assertEqual(manager.elem_id(contents=mixed_keys), mixed_id)
+
+            self.assertEqual(len(manager), 2)
+
+            nan_id = manager.provide_entry(
+                contents={'x': float('nan')}, include=True, missing_ok=True
+            )
+            reloaded = Manager(path)
+            self.assertEqual(
+                reloaded.elem_id(contents={'x': float('nan')}), nan_id
+            )
+
 
 class PersisterTest(TestCase):
     def test_Persister(self):
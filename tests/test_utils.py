@@ -1,15 +1,144 @@
+from multiprocessing import Pool
+from pathlib import Path
+from typing import List
 from unittest.case import TestCase
 
+import numpy as np
+
 from boiling_learning.utils.collections import KeyedSet
 from boiling_learning.utils.geometry import Cylinder, Prism, RectangularPrism
+from boiling_learning.utils.mathutils import minmax
 from boiling_learning.utils.Parameters import Parameters
-from boiling_learning.utils.utils import indexify
+from boiling_learning.utils.utils import (
+    file_lock,
+    first_missing_int,
+    indexify,
+    tempdir,
+)
+from boiling_learning.utils.worker import (
+    DynamicUserPool,
+    UserPool,
+    distribute_iterable,
+)
+
+
+def _increment_locked(path: Path) -> None:
+    for _ in range(50):
+        with file_lock(path.with_suffix('.lock')):
+            path.write_text(str(int(path.read_text()) + 1))
+
+
+def _stamp_tickets(path: Path) -> List[int]:
+    user_pool = DynamicUserPool(path)
+    return [user_pool.stamp_ticket() for _ in range(4)]
 
 
 class utils_utils_test(TestCase):
     def test_indexify(self):
         self.assertEqual(tuple(indexify('abc')), (0, 1, 2))
 
+    def test_file_lock(self):
+        with tempdir() as path:
+            counter_path = path / 'counter'
+            counter_path.write_text('0')
+
+            with Pool(4) as pool:
+                pool.map(_increment_locked, [counter_path] * 4)
+
+            self.assertEqual(counter_path.read_text(), '200')
+
+    def test_first_missing_int(self):
+        self.assertEqual(first_missing_int(set()), 0)
+        self.assertEqual(first_missing_int(set(), start=5), 5)
+        self.assertEqual(first_missing_int({0, 1, 3}), 2)
+        self.assertEqual(first_missing_int({0, 1, 2}), 3)
+        self.assertEqual(first_missing_int({-1, 2, 3}, start=2), 4)
+        self.assertEqual(first_missing_int({0, 1, 10 ** 9}), 2)
+        self.assertEqual(first_missing_int({0, 99999999999}), 1)
+
+
+class utils_mathutils_test(TestCase):
+    def test_minmax(self):
+        self.assertTupleEqual(minmax([3, 1, 4, 1, 5]), (1, 5))
+        self.assertTupleEqual(minmax([3, 1, 4, 1, 5, 9]), (1, 9))
+        self.assertTupleEqual(minmax([2]), (2, 2))
+        self.assertTupleEqual(minmax(iter([5, 4, 3, 2])), (2, 5))
+        self.assertTupleEqual(minmax(np.array([3, -1, 2])), (-1, 3))
+
+        self.assertTupleEqual(minmax([], default=0), (0, 0))
+        with self.assertRaises(ValueError):
+            minmax([])
+
+        nan = float('nan')
+        self.assertTupleEqual(minmax([1.0, nan, 3.0]), (1.0, 3.0))
+        self.assertTupleEqual(minmax([1.0, 3.0, nan]), (1.0, 3.0))
+        self.assertTupleEqual(minmax(np.array([1.0, nan, 3.0])), (1.0, 3.0))
+
+
+class utils_worker_test(TestCase):
+    def test_distribute_iterable(self):
+        self.assertDictEqual(
+            distribute_iterable('abc', range(7)),
+            {'a': [0, 3, 6], 'b': [1, 4], 'c': [2, 5]},
+        )
+        with self.assertRaises(ValueError):
+            distribute_iterable('', range(3))
+
+    def test_distribute_iterable_assignments(self):
+        self.assertDictEqual(
+            distribute_iterable(
+                'abc', range(6), assignments={'a': [10, 11, 12], 'b': [13]}
+            ),
+            {'a': [10, 11, 12], 'b': [13, 2, 4], 'c': [0, 1, 3, 5]},
+        )
+        distributed = distribute_iterable(
+            'ab', range(24), assignments={'a': [0], 'b': range(7)}
+        )
+        self.assertEqual(len(distributed['a']), 16)
+        self.assertEqual(len(distributed['b']), 16)
+        self.assertDictEqual(distribute_iterable('', [], assignments={}), {})
+        with self.assertRaises(ValueError):
+            distribute_iterable('', range(3), assignments={})
+
+    def test_distribute_iterable_weights(self):
+        self.assertDictEqual(
+            distribute_iterable('ab', range(9), weights={'a': 2}),
+            {'a': [0, 1, 3, 4, 6, 7], 'b': [2, 5, 8]},
+        )
+        self.assertDictEqual(
+            distribute_iterable('ab', range(3), weights={'a': 0}),
+            {'a': [], 'b': [0, 1, 2]},
+        )
+        with self.assertRaises(ValueError):
+            distribute_iterable('ab', range(3), weights={'a': 0, 'b': 0})
+        with self.assertRaises(ValueError):
+            distribute_iterable('ab', range(3), weights={'a': -1})
+
+    def test_DynamicUserPool_stamp_ticket(self):
+        with tempdir() as path:
+            DynamicUserPool(path, workers=range(16))
+
+            with Pool(4) as pool:
+                tickets = [
+                    ticket
+                    for stamped in pool.map(_stamp_tickets, [path] * 4)
+                    for ticket in stamped
+                ]
+
+            self.assertListEqual(sorted(tickets), list(range(16)))
+            self.assertSetEqual(
+                DynamicUserPool(path).used_tickets(), set(range(16))
+            )
+
+    def test_UserPool_get_iterable(self):
+        workers = ['carol', 'alice', 'bob']
+        for current in workers:
+            user_pool = UserPool(workers, current=current)
+            self.assertListEqual(
+                user_pool.get_iterable(range(10)),
+                distribute_iterable(user_pool, range(10))[current],
+            )
+
 
 class utils_collections_test(TestCase):
     def test_KeyedSet(self):
@@ -22,6 +151,8 @@ class utils_collections_test(TestCase):
         self.assertEqual(keyed_set['BYE'], 'bye')
         self.assertIn('hello', keyed_set)
         self.assertNotIn('byello', keyed_set)
+        self.assertNotIn('HELLO', keyed_set)
+        self.assertNotIn(5, keyed_set)
 
         keyed_set.add('byello')
         self.assertIn('byello', keyed_set)
@@ -29,6 +160,10 @@ class utils_collections_test(TestCase):
         keyed_set.discard('hello')
         self.assertNotIn('hello', keyed_set)
 
+        nan = float('nan')
+        nan_set = KeyedSet(str, (nan,))
+        self.assertIn(nan, nan_set)
+
 
 class geometry_test(TestCase):
     def test_Prism(self):